@@ -1,204 +1,1123 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, g, has_request_context, abort
+from flask.json.provider import JSONProvider
+import click
 from flask_cors import CORS
 import requests
 import datetime
 import random
 import os
+import time
+import threading
+import gzip
+import hashlib
+import hmac
+import json
+import mimetypes
+import re
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Responses fall back to gzip
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # JSON falls back to the standard library
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
+app = Flask(__name__, static_folder=None)  # Frontend assets are served by fingerprinted_asset
 CORS(app)  # Enable CORS for all routes
 
+# --- JSON backend ---
+def _json_default(obj):
+    """Serialize values the JSON backends don't handle natively"""
+    if isinstance(obj, datetime.datetime):
+        # Datetimes stored in MongoDB are naive UTC
+        return (obj if obj.tzinfo else obj.replace(tzinfo=datetime.timezone.utc)).isoformat()
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_loads(data):
+    """Decode JSON from bytes or str with the fastest available backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Encode to UTF-8 JSON bytes; datetimes become ISO 8601 in UTC"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def read_json(response):
+    """Decode an upstream response body; faster than requests' Response.json().
+
+    Like Response.json(), an undecodable body raises a RequestException, so
+    callers' existing network-error handling still covers it.
+    """
+    try:
+        return json_loads(response.content)
+    except ValueError as e:
+        raise requests.exceptions.InvalidJSONError(f"Invalid JSON in response from {response.url}: {e}", response=response)
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by json_dumps/json_loads"""
+
+    def dumps(self, obj, **kwargs):
+        return json_dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the bytes -> str -> bytes round trip of the default implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_dumps(obj), mimetype='application/json')
+
+app.json = FastJSONProvider(app)
+
 # --- MongoDB Connection ---
 MONGO_URI = os.getenv('MONGO_URI')
-db = None
-profiles_collection = None
-if MONGO_URI:
-    try:
-        client = MongoClient(MONGO_URI)
-        # The ismaster command is cheap and does not require auth.
-        client.admin.command('ismaster')
-        db = client.github_analyzer # Use a database named 'github_analyzer'
-        profiles_collection = db.profiles # Use a collection named 'profiles'
-        print("MongoDB connection successful.")
-    except ConnectionFailure as e:
-        print(f"MongoDB connection failed: {e}")
-        db = None
-else:
+# Fail fast instead of pymongo's 30s default so a slow cluster can't stall requests
+MONGO_TIMEOUT_MS = int(os.getenv('MONGO_TIMEOUT_MS', 3000))
+MONGO_RETRY_SECONDS = 30
+
+class MongoConnection:
+    """Connects to MongoDB in a background thread, once per process.
+
+    Nothing is opened at import time, so the module is safe to load before
+    gunicorn forks (--preload); each worker connects on its first request.
+    Until the connection is ready, database features are skipped as if
+    MongoDB were not configured.
+    """
+
+    def __init__(self, uri):
+        self.uri = uri
+        self.state = 'connecting' if uri else 'disabled'
+        self.db = None
+        self.profiles = None
+        self.cache = None
+        self._pid = None
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start connecting if this process hasn't yet, or retry after a failure"""
+        if not self.uri:
+            return
+        with self._lock:
+            retry = self.state == 'failed' and time.monotonic() - self._failed_at >= MONGO_RETRY_SECONDS
+            if self._pid == os.getpid() and not retry:
+                return
+            self._pid = os.getpid()
+            self.state = 'connecting'
+            self.db = self.profiles = self.cache = None
+        threading.Thread(target=self.connect, name='mongo-connect', daemon=True).start()
+
+    def connect(self):
+        """Connect synchronously; start() runs this in the background"""
+        if not self.uri:
+            return
+        client = None
+        try:
+            client = MongoClient(self.uri, serverSelectionTimeoutMS=MONGO_TIMEOUT_MS)
+            # The ping command is cheap and does not require auth.
+            client.admin.command('ping')
+            db = client.github_analyzer # Use a database named 'github_analyzer'
+            cache = db.cache # Entries shared by every worker; see SharedCache
+            # MongoDB deletes entries once expires_at passes
+            cache.create_index('expires_at', expireAfterSeconds=0)
+            db.profiles.create_index('login_lower')
+            self.db, self.profiles, self.cache = db, db.profiles, cache
+            self.state = 'ready'
+            print("MongoDB connection successful.")
+        except PyMongoError as e:
+            if client is not None:
+                client.close()
+            self._failed_at = time.monotonic()
+            self.state = 'failed'
+            print(f"MongoDB connection failed: {e}")
+
+mongo = MongoConnection(MONGO_URI)
+if not MONGO_URI:
     print("MONGO_URI not found. Database features will be disabled.")
 
+def get_profiles_collection():
+    """The profiles collection, or None while MongoDB is unavailable"""
+    mongo.start()
+    return mongo.profiles
+
 # GitHub API token from environment variable
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-HEADERS = {'Authorization': f'token {GITHUB_TOKEN}'}
+# Optional comma-separated pool of tokens; requests are spread across them
+GITHUB_TOKENS = [t.strip() for t in os.getenv('GITHUB_TOKENS', '').split(',') if t.strip()]
+# Base headers for GitHub API requests; github_get adds the Authorization header
+HEADERS = {
+    'Accept': 'application/vnd.github.v3+json',
+    'User-Agent': 'GitHub-Profile-Analyzer'
+}
+
+#################################################################
+# GitHub token pool
+#################################################################
+
+# Hourly budgets GitHub grants an authenticated token per resource; search is per minute
+DEFAULT_RATE_LIMITS = {'core': 5000, 'search': 30}
+
+class GitHubToken:
+    """A credential plus what GitHub last told us about its remaining budget"""
+
+    def __init__(self, value):
+        self.value = value
+        self.remaining = dict(DEFAULT_RATE_LIMITS)
+        self.reset_at = {resource: 0 for resource in DEFAULT_RATE_LIMITS}
+        self.requests_made = 0
+
+    @property
+    def label(self):
+        return f"{self.value[:4]}...{self.value[-4:]}"
+
+    def is_exhausted(self, resource, now):
+        return self.remaining.get(resource, 0) <= 0 and self.reset_at.get(resource, 0) > now
+
+    def roll_over(self, resource, now):
+        """Restore the full budget once GitHub's reset time has passed"""
+        if 0 < self.reset_at.get(resource, 0) <= now:
+            self.remaining[resource] = DEFAULT_RATE_LIMITS.get(resource, 0)
+            self.reset_at[resource] = 0
+
+class TokenPool:
+    """Routes each GitHub call to the token with the most budget left.
+
+    Tokens that have used up a resource are retired until GitHub's reset time
+    for it. Budgets come from the X-RateLimit-* headers of every response.
+    """
+
+    def __init__(self, values):
+        self.tokens = [GitHubToken(value) for value in dict.fromkeys(values)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def acquire(self, resource):
+        """Pick a token for `resource`, or None if the pool is empty"""
+        if not self.tokens:
+            return None
+        now = time.time()
+        with self._lock:
+            for token in self.tokens:
+                token.roll_over(resource, now)
+            live = [token for token in self.tokens if not token.is_exhausted(resource, now)]
+            if live:
+                token = max(live, key=lambda t: t.remaining.get(resource, 0))
+            else:
+                # Everything is exhausted; use the one that resets first
+                token = min(self.tokens, key=lambda t: t.reset_at.get(resource, 0))
+            # Reserve one call so concurrent requests spread across tokens
+            token.remaining[resource] = token.remaining.get(resource, 0) - 1
+            token.requests_made += 1
+            return token
+
+    def update(self, token, resource, response_headers):
+        """Record the budget GitHub reported for the token"""
+        resource = response_headers.get('X-RateLimit-Resource', resource)
+        remaining = response_headers.get('X-RateLimit-Remaining')
+        reset_at = response_headers.get('X-RateLimit-Reset')
+        if remaining is None or reset_at is None:
+            return
+        with self._lock:
+            token.remaining[resource] = int(remaining)
+            token.reset_at[resource] = int(reset_at)
+        if int(remaining) == 0:
+            print(f"GitHub token {token.label} exhausted for {resource} until {datetime.datetime.fromtimestamp(int(reset_at))}")
+
+    def report(self):
+        """Per-token usage and remaining budget; tokens are identified by position only"""
+        now = time.time()
+        with self._lock:
+            return [{
+                'token': index + 1,
+                'requests_made': token.requests_made,
+                'remaining': dict(token.remaining),
+                'reset_at': dict(token.reset_at),
+                'retired': [r for r in token.remaining if token.is_exhausted(r, now)]
+            } for index, token in enumerate(self.tokens)]
+
+github_tokens = TokenPool(GITHUB_TOKENS or ([GITHUB_TOKEN] if GITHUB_TOKEN else []))
+
+#################################################################
+# Upstream call budget, hedging and circuit breaking
+#################################################################
+
+# Total time a single API request may spend waiting on GitHub/Groq. Kept below
+# gunicorn's default 30s worker timeout so we answer before being killed.
+REQUEST_BUDGET_SECONDS = float(os.getenv('REQUEST_BUDGET_SECONDS', 25))
+# Send a duplicate GitHub GET if the first hasn't answered after this many
+# seconds. 0 disables hedging.
+HEDGE_AFTER_SECONDS = float(os.getenv('HEDGE_AFTER_SECONDS', 0))
+# Don't start an upstream call with less budget left than this
+MIN_CALL_SECONDS = 1.0
+# Optional enrichment steps are skipped when less than this is left
+OPTIONAL_STEP_MIN_SECONDS = 5.0
+DEFAULT_CALL_TIMEOUT = 15
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when the request budget is too low to start another upstream call"""
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised when an upstream service is short-circuited after repeated failures"""
+
+class Deadline:
+    """Wall-clock budget shared by every upstream call made for one request"""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def has(self, seconds):
+        return self.remaining() >= seconds
+
+    def timeout(self, cap=DEFAULT_CALL_TIMEOUT):
+        """Timeout for the next call, never past the deadline"""
+        remaining = self.remaining()
+        if remaining < MIN_CALL_SECONDS:
+            raise DeadlineExceeded(f"Request budget exhausted ({remaining:.1f}s left)")
+        return min(cap, remaining)
+
+class CircuitBreaker:
+    """Stops calling an upstream service while it keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast. Once `reset_after` seconds pass a single probe call is let
+    through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_after=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state = 'half_open'
+                return True
+            return self.state == 'closed'
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+_http_session = None
+_http_session_pid = None
+_http_session_lock = threading.Lock()
+
+def http_session():
+    """Process-wide pooled HTTP session, created lazily so it is never shared across a fork"""
+    global _http_session, _http_session_pid
+    if _http_session_pid != os.getpid():
+        with _http_session_lock:
+            if _http_session_pid != os.getpid():
+                session = requests.Session()
+                # Enough pooled connections for the hedge and search workers
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount('https://', adapter)
+                _http_session = session
+                _http_session_pid = os.getpid()
+    return _http_session
+
+github_breaker = CircuitBreaker('github')
+groq_breaker = CircuitBreaker('groq')
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+
+@app.before_request
+def start_deadline():
+    g.deadline = Deadline(REQUEST_BUDGET_SECONDS)
+    # Kick off this worker's MongoDB connection without waiting for it
+    mongo.start()
+
+def current_deadline():
+    """Deadline of the active request, or None outside a request"""
+    if has_request_context():
+        return g.get('deadline')
+    return None
+
+def _hedged_request(method, url, kwargs):
+    """Issue a second identical request if the first is slow; first answer wins"""
+    first = _hedge_pool.submit(http_session().request, method, url, **kwargs)
+    done, _ = wait([first], timeout=HEDGE_AFTER_SECONDS)
+    if done:
+        return first.result()
+
+    # The hedge must not outlive the original call's timeout
+    hedge_kwargs = dict(kwargs, timeout=max(MIN_CALL_SECONDS, kwargs['timeout'] - HEDGE_AFTER_SECONDS))
+    second = _hedge_pool.submit(http_session().request, method, url, **hedge_kwargs)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                return future.result()
+            error = future.exception()
+    raise error
+
+def upstream_request(breaker, method, url, timeout=DEFAULT_CALL_TIMEOUT, hedge=False, deadline=None, **kwargs):
+    """Make an upstream HTTP call within the request deadline and circuit breaker.
+
+    Worker threads have no request context, so they pass `deadline` explicitly.
+    """
+    if deadline is None:
+        deadline = current_deadline()
+    kwargs['timeout'] = deadline.timeout(timeout) if deadline is not None else timeout
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} circuit is open, skipping {url}")
+
+    try:
+        if hedge and HEDGE_AFTER_SECONDS > 0:
+            response = _hedged_request(method, url, kwargs)
+        else:
+            response = http_session().request(method, url, **kwargs)
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        raise
+
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+def github_get(url, headers=None, **kwargs):
+    """GET from the GitHub API using the pool token with the most budget left.
+
+    Idempotent, so eligible for hedging.
+    """
+    resource = 'search' if '/search/' in url else 'core'
+    token = github_tokens.acquire(resource)
+    headers = dict(headers or HEADERS)
+    if token is not None:
+        headers['Authorization'] = f'token {token.value}'
+    response = upstream_request(github_breaker, 'GET', url, hedge=True, headers=headers, **kwargs)
+    if token is not None:
+        github_tokens.update(token, resource, response.headers)
+    return response
+
+def groq_post(**kwargs):
+    """POST a chat completion to Groq"""
+    return upstream_request(groq_breaker, 'POST', GROQ_API_URL, **kwargs)
+
+#################################################################
+# In-process caches
+#################################################################
+
+class TTLCache:
+    """Thread-safe, per-process dict whose entries expire after `ttl` seconds.
+
+    Holds at most `max_entries`, evicting the oldest first.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic(), value)
+            # Dicts keep insertion order, so the first keys are the oldest
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def pop(self, key):
+        """Drop an entry; returns whether one was cached"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def pop_where(self, predicate):
+        """Drop every entry whose key matches `predicate`; returns how many were cached"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+class SharedCache:
+    """Cache shared by every worker and instance through MongoDB.
+
+    Entries live in the `cache` collection, so a webhook handled by any one
+    worker invalidates them for the whole fleet; TTLs only bound how stale
+    data can get for users without a webhook. While MongoDB is unavailable a
+    per-process TTLCache stands in, and invalidations only reach that process.
+
+    `encode`/`decode` convert values to and from BSON-safe documents.
+    """
+
+    def __init__(self, name, ttl, max_local_entries, encode=None, decode=None):
+        self.name = name
+        self.ttl = ttl
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.local = TTLCache(ttl, max_local_entries)
+
+    def _id(self, key):
+        parts = key if isinstance(key, tuple) else (key,)
+        return '|'.join([self.name, *map(str, parts)])
+
+    def _collection(self):
+        return mongo.cache if mongo.state == 'ready' else None
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """Cached values for whichever of `keys` are present, in one round trip"""
+        collection = self._collection()
+        if collection is None:
+            found = {key: self.local.get(key) for key in keys}
+            return {key: value for key, value in found.items() if value is not None}
+        ids = {self._id(key): key for key in keys}
+        try:
+            docs = collection.find({'_id': {'$in': list(ids)}, 'expires_at': {'$gt': datetime.datetime.utcnow()}})
+            return {ids[doc['_id']]: self.decode(doc['value']) for doc in docs}
+        except PyMongoError as e:
+            print(f"Shared cache {self.name} read failed: {e}")
+            return {}
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        """Store every key/value pair of `values`, in one round trip"""
+        if not values:
+            return
+        collection = self._collection()
+        if collection is None:
+            for key, value in values.items():
+                self.local.set(key, value)
+            return
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.ttl)
+        try:
+            collection.bulk_write([
+                ReplaceOne({'_id': self._id(key)}, {'value': self.encode(value), 'expires_at': expires_at}, upsert=True)
+                for key, value in values.items()
+            ], ordered=False)
+        except PyMongoError as e:
+            print(f"Shared cache {self.name} write failed: {e}")
+
+    def pop(self, key):
+        """Drop an entry everywhere; returns whether one was cached"""
+        removed = self.local.pop(key)
+        collection = self._collection()
+        if collection is not None:
+            try:
+                removed = collection.delete_one({'_id': self._id(key)}).deleted_count > 0 or removed
+            except PyMongoError as e:
+                print(f"Shared cache {self.name} invalidation failed: {e}")
+        return removed
+
+    def pop_group(self, first):
+        """Drop every tuple key starting with `first` everywhere; returns how many were cached"""
+        removed = self.local.pop_where(lambda key: isinstance(key, tuple) and key[0] == first)
+        collection = self._collection()
+        if collection is not None:
+            try:
+                # An anchored prefix match can use the _id index
+                prefix = re.escape(self._id((first, '')))
+                removed += collection.delete_many({'_id': {'$regex': f'^{prefix}'}}).deleted_count
+            except PyMongoError as e:
+                print(f"Shared cache {self.name} invalidation failed: {e}")
+        return removed
+
+def _as_utc(value):
+    # MongoDB hands datetimes back naive, in UTC
+    return value if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc)
+
+# Harvested search results per (endpoint, lowercased query, day); finished days rarely change.
+# Item keys can be ints and language names can contain dots, so dicts are stored as pairs.
+search_day_cache = SharedCache(
+    'search_day', ttl=6 * 60 * 60, max_local_entries=20000,
+    encode=lambda results: [[key, when] for key, when in results.items()],
+    decode=lambda pairs: {key: _as_utc(when) for key, when in pairs}
+)
+# Language byte counts per lowercased repo full name
+repo_language_cache = SharedCache(
+    'repo_languages', ttl=24 * 60 * 60, max_local_entries=20000,
+    encode=lambda languages: [[lang, count] for lang, count in languages.items()],
+    decode=lambda pairs: dict(pairs)
+)
+# Total stars across a user's repos per lowercased login
+star_total_cache = SharedCache('star_totals', ttl=60 * 60, max_local_entries=10000)
+
+#################################################################
+# Compact records for events and repositories
+#################################################################
+
+# Event types that count as contributing to a repository
+CONTRIBUTION_EVENT_TYPES = frozenset(['PushEvent', 'PullRequestEvent', 'IssuesEvent', 'CreateEvent', 'ForkEvent'])
+
+class EventRecord:
+    """The few fields we read from a GitHub event, with its timestamp pre-parsed"""
+    __slots__ = ('type', 'repo_name', 'created_at', 'commit_count')
+
+    def __init__(self, event):
+        self.type = event['type']
+        self.repo_name = event.get('repo', {}).get('name')
+        self.created_at = datetime.datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
+        # Only push events carry commits; keep the count rather than the payload
+        self.commit_count = len(event.get('payload', {}).get('commits', [])) if self.type == 'PushEvent' else 0
+
+class RepoRecord:
+    """The repository fields used for stats, language and commit lookups"""
+    __slots__ = ('name', 'full_name', 'fork', 'language', 'stargazers_count', 'forks_count', 'size')
+
+    def __init__(self, repo):
+        self.name = repo['name']
+        self.full_name = repo['full_name']
+        self.fork = repo.get('fork', False)
+        self.language = repo.get('language')
+        self.stargazers_count = repo.get('stargazers_count', 0)
+        self.forks_count = repo.get('forks_count', 0)
+        self.size = repo.get('size', 0)
+
+def fetch_records(url, record_type, max_pages=None, params=None, headers=None, raise_for_status=False):
+    """Fetch a paginated GitHub list, projecting each page into compact records.
+
+    Each raw page is dropped as soon as it is converted, so at most one page of
+    full JSON is alive at a time. Stops at the first empty or short page; on an
+    error response it raises if `raise_for_status` is set, otherwise returns
+    what it has so far.
+    """
+    records = []
+    page = 1
+    while max_pages is None or page <= max_pages:
+        response = github_get(
+            url,
+            headers=headers or HEADERS,
+            params={**(params or {}), 'per_page': 100, 'page': page}
+        )
+        if raise_for_status:
+            response.raise_for_status()
+        elif not response.ok:
+            break
+        page_items = read_json(response)
+        records.extend(record_type(item) for item in page_items)
+        if len(page_items) < 100:
+            break
+        page += 1
+    return records
+
+#################################################################
+# Search result harvesting
+#################################################################
+
+# GitHub search returns at most 1000 results per query, 100 per page
+SEARCH_RESULT_CAP = 1000
+SEARCH_PAGE_SIZE = 100
+# Aim for shards comfortably under the cap so small growth doesn't re-split
+SEARCH_SHARD_TARGET = 900
+SEARCH_CONCURRENCY = 4
+# Per token; GitHub allows 30 searches/minute per token but only 10 without one
+SEARCH_REQUESTS_PER_MINUTE = int(os.getenv('SEARCH_REQUESTS_PER_MINUTE', 30 if len(github_tokens) else 10))
+
+def parse_github_date(value):
+    """Parse a GitHub timestamp ('...Z' or with an offset) into an aware UTC datetime"""
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(datetime.timezone.utc)
+
+class SearchRateLimiter:
+    """Token bucket keeping this worker within GitHub's search requests/minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.refill_rate
+            if deadline is not None and not deadline.has(wait_for + MIN_CALL_SECONDS):
+                raise DeadlineExceeded("Search rate budget exhausted for this request")
+            time.sleep(wait_for)
+
+# Each token has its own search budget
+search_rate_limiter = SearchRateLimiter(SEARCH_REQUESTS_PER_MINUTE * max(1, len(github_tokens)))
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY, thread_name_prefix='search')
+
+def _split_day_range(first_day, last_day, total_count):
+    """Split an inclusive day range into sub-ranges sized to stay under the result cap"""
+    num_days = (last_day - first_day).days + 1
+    num_shards = min(num_days, -(-total_count // SEARCH_SHARD_TARGET))
+    shard_days = -(-num_days // num_shards)
+    shards = []
+    shard_start = first_day
+    while shard_start <= last_day:
+        shard_end = min(last_day, shard_start + datetime.timedelta(days=shard_days - 1))
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + datetime.timedelta(days=1)
+    return shards
+
+def _days_in(day_range):
+    first, last = day_range
+    return [first + datetime.timedelta(days=i) for i in range((last - first).days + 1)]
+
+def commit_search_query(username):
+    return f'author:{username} OR committer:{username}'
+
+def issue_search_query(username, search_type):
+    return f'author:{username} type:{search_type}'
+
+def harvest_search(endpoint, query, date_qualifier, start_date, end_date, item_key, item_date, headers=None):
+    """Collect every result of a GitHub search across a date range.
+
+    The range is split into day-aligned shards sized from `total_count` so no
+    shard hits the 1000 result cap, and pages are fetched concurrently within
+    the search rate limit. Results are deduplicated by `item_key` and cached per
+    finished day.
+
+    Returns ({key: utc datetime}, complete) where complete is False if any
+    shard could not be fully read.
+    """
+    headers = headers or HEADERS
+    deadline = current_deadline()
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    first_day, last_day = start_date.date(), end_date.date()
+
+    results = {}
+    uncached_ranges = []
+    past_days = _days_in((first_day, min(last_day, today - datetime.timedelta(days=1)))) if first_day < today else []
+    cached_days = search_day_cache.get_many([(endpoint, query.lower(), d) for d in past_days])
+    day = first_day
+    while day <= last_day:
+        cached = cached_days.get((endpoint, query.lower(), day))
+        if cached is not None:
+            results.update(cached)
+        elif uncached_ranges and uncached_ranges[-1][1] == day - datetime.timedelta(days=1):
+            uncached_ranges[-1] = (uncached_ranges[-1][0], day)
+        else:
+            uncached_ranges.append((day, day))
+        day += datetime.timedelta(days=1)
+
+    def fetch_page(day_range, page):
+        q = f"{query} {date_qualifier}:{day_range[0].isoformat()}..{day_range[1].isoformat()}"
+        try:
+            search_rate_limiter.acquire(deadline)
+            response = github_get(
+                f'https://api.github.com/search/{endpoint}',
+                headers=headers,
+                params={'q': q, 'per_page': SEARCH_PAGE_SIZE, 'page': page},
+                deadline=deadline
+            )
+            response.raise_for_status()
+            return read_json(response)
+        except requests.exceptions.RequestException as e:
+            print(f"Search page {page} for {q!r} failed: {e}")
+            return None
+
+    harvested = {}
+    incomplete_days = set()
+
+    def collect(day_range, page_data):
+        if page_data is None or page_data.get('incomplete_results'):
+            incomplete_days.update(_days_in(day_range))
+        if page_data is None:
+            return
+        for item in page_data.get('items', []):
+            try:
+                harvested[item_key(item)] = parse_github_date(item_date(item))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    pending = uncached_ranges
+    while pending:
+        probes = list(_search_pool.map(lambda r: fetch_page(r, 1), pending))
+        next_pending = []
+        page_jobs = []
+        for day_range, first_page in zip(pending, probes):
+            if first_page is None:
+                collect(day_range, first_page)
+                continue
+            total_count = first_page.get('total_count', 0)
+            if total_count > SEARCH_RESULT_CAP and day_range[0] < day_range[1]:
+                # The shards fetch these days again, so this probe's page and flags don't count
+                next_pending.extend(_split_day_range(day_range[0], day_range[1], total_count))
+                continue
+            collect(day_range, first_page)
+            if total_count > SEARCH_RESULT_CAP:
+                # A single day over the cap can't be split any further
+                incomplete_days.add(day_range[0])
+            num_pages = -(-min(total_count, SEARCH_RESULT_CAP) // SEARCH_PAGE_SIZE)
+            page_jobs.extend((day_range, page) for page in range(2, num_pages + 1))
+        for (day_range, _), page_data in zip(page_jobs, _search_pool.map(lambda job: fetch_page(*job), page_jobs)):
+            collect(day_range, page_data)
+        pending = next_pending
+
+    by_day = {}
+    for key, when in harvested.items():
+        by_day.setdefault(when.date(), {})[key] = when
+    for first, last in uncached_ranges:
+        for day in _days_in((first, last)):
+            if day < today and day not in incomplete_days:
+                search_day_cache.set((endpoint, query.lower(), day), by_day.get(day, {}))
+
+    results.update(harvested)
+    return results, not incomplete_days
+
+#################################################################
+# API response caching and compression
+#################################################################
+
+# Browser/CDN cache lifetime in seconds per API route; other routes are not cached
+API_CACHE_MAX_AGE = {
+    'get_profile': 300,
+    'get_repositories': 600,
+    'get_languages': 3600,
+    'get_user_languages': 3600,
+    'get_commits': 900,
+    'get_activity': 900,
+    'get_rating_history': 3600
+}
+# Bodies smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+# ETags are hashes of finished bodies, which only exist after the upstream calls.
+# Remembering each tag for its route's max-age lets a revalidation (e.g. a reload)
+# inside that window get its 304 before any of that work. Clients may already
+# treat the response as fresh that long, so this adds no staleness. Entries are
+# keyed by lowercased username so webhooks can forget a user's tags.
+issued_etags = {
+    endpoint: SharedCache(f'etag:{endpoint}', ttl=max_age, max_local_entries=10000)
+    for endpoint, max_age in API_CACHE_MAX_AGE.items()
+}
+
+def mark_partial(*steps):
+    """Flag the current response as missing `steps`.
+
+    Routes call this whenever an inner step failed or was cut short, so the
+    incomplete body is served no-store and its ETag is never remembered.
+    """
+    skipped = g.setdefault('skipped_steps', [])
+    skipped.extend(step for step in steps if step not in skipped)
+
+def _issued_etag_key():
+    return ((request.view_args or {}).get('username', '').lower(), request.full_path)
+
+def forget_issued_etags(logins):
+    """Stop answering 304 from remembered tags for these users' routes"""
+    return sum(etags.pop_group(login.lower()) for etags in issued_etags.values() for login in logins)
+
+@app.before_request
+def answer_recent_revalidation():
+    """Answer 304 to If-None-Match for a tag issued within the route's max-age"""
+    etags = issued_etags.get(request.endpoint)
+    if etags is None or request.method != 'GET' or not request.if_none_match:
+        return None
+    etag = etags.get(_issued_etag_key())
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    response = app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+@app.after_request
+def cache_and_compress(response):
+    """Add ETag/Cache-Control to API responses, answer conditional GETs and compress"""
+    if not request.path.startswith('/api/') or response.direct_passthrough:
+        return response
+
+    max_age = API_CACHE_MAX_AGE.get(request.endpoint)
+    skipped = g.get('skipped_steps')
+    if skipped:
+        # Let clients tell incomplete data apart, whatever the body's shape
+        response.headers['X-Partial-Result'] = ', '.join(skipped)
+    if request.method == 'GET' and response.status_code in (200, 304) and max_age and not skipped:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        if response.status_code == 200:
+            # Weak, so the same tag is valid for compressed and plain bodies
+            response.add_etag(weak=True)
+            issued_etags[request.endpoint].set(_issued_etag_key(), response.get_etag()[0])
+            response.make_conditional(request)
+    else:
+        response.cache_control.no_store = True
+    response.vary.add('Accept-Encoding')
+
+    if response.status_code != 200 or response.content_encoding:
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=5))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(data, compresslevel=6))
+    else:
+        return response
+    response.content_encoding = encoding
+    return response
+
+#################################################################
+# Rating engine
+#################################################################
+
+# Stats from get_profile that feed the rating, stored alongside each profile
+RATING_STAT_FIELDS = ('total_stars', 'commits_current_year', 'total_prs', 'total_issues', 'contributed_to')
+RESCORE_BATCH_SIZE = 1000
+
+def calculate_rating(created_at, followers, public_repos, stats, now=None):
+    """Score a profile from its GitHub profile fields and get_profile stats.
+
+    `created_at` is a naive UTC datetime, as stored in MongoDB.
+    """
+    now = now or datetime.datetime.utcnow()
+    # Enhanced scoring with higher base values and multipliers
+    star_score = min(20, (stats.get('total_stars') or 0) * 0.5 + 10)  # Stars (20%) + base 10
+    commit_score = min(35, (stats.get('commits_current_year') or 0) * 0.8 + 15)  # Commits (35%) + base 15
+    pr_score = min(15, (stats.get('total_prs') or 0) * 1.5 + 5)  # PRs (15%) + base 5
+    issue_score = min(10, (stats.get('total_issues') or 0) * 1.0 + 3)  # Issues (10%) + base 3
+    contribution_score = min(10, (stats.get('contributed_to') or 0) * 3 + 5)  # Contributions (10%) + base 5
+
+    # Account age bonus (more generous)
+    age_bonus = min(10, ((now - created_at).days / 365) * 5 + 5)  # Max 10 points, base 5
+
+    # Repository quality bonus (more generous)
+    repo_bonus = min(15, (public_repos or 0) * 1.2 + 8)  # Max 15 points, base 8
+
+    # Follower bonus
+    follower_bonus = min(5, (followers or 0) * 0.1)
+
+    total_score = round(star_score + commit_score + pr_score + issue_score + contribution_score + age_bonus + repo_bonus + follower_bonus)
+    return max(50, min(100, total_score))  # Minimum 50, maximum 100
+
+def rescore_profiles(profiles_collection, batch_size=RESCORE_BATCH_SIZE, stale_only=False):
+    """Recompute stored ratings from stored stats, one batch at a time.
+
+    Streams the collection through a cursor so memory stays bounded by
+    `batch_size`. Each profile also gets today's point in its rating
+    history and its rating_stale flag cleared. With `stale_only`, only
+    profiles flagged by webhooks are rescored. Profiles saved before stats
+    were stored are skipped. Returns (rescored, skipped) counts.
+    """
+    now = datetime.datetime.utcnow()
+    history_key = f"rating_history.{now.strftime('%Y-%m-%d')}"
+    projection = ['created_at', 'followers', 'public_repos', 'stats']
+    query = {'rating_stale': True} if stale_only else {}
+    cursor = profiles_collection.find(query, projection=projection, batch_size=batch_size)
+    rescored = skipped = 0
+
+    def flush(batch):
+        updates = []
+        for doc in batch:
+            rating = calculate_rating(doc['created_at'], doc.get('followers'), doc.get('public_repos'), doc['stats'], now)
+            # login_lower also backfills documents saved before it was stored
+            updates.append(UpdateOne({'_id': doc['_id']}, {'$set': {
+                'rating': rating, history_key: rating, 'rating_stale': False, 'login_lower': doc['_id'].lower()
+            }}))
+        profiles_collection.bulk_write(updates, ordered=False)
+
+    batch = []
+    for doc in cursor:
+        if not doc.get('stats') or not doc.get('created_at'):
+            skipped += 1
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush(batch)
+            rescored += len(batch)
+            batch = []
+    if batch:
+        flush(batch)
+        rescored += len(batch)
+    return rescored, skipped
+
+@app.cli.command('rescore-ratings')
+@click.option('--stale-only', is_flag=True, help='Only rescore profiles flagged stale by webhooks.')
+def rescore_ratings_command(stale_only):
+    """Recompute stored ratings: flask --app app rescore-ratings [--stale-only]"""
+    mongo.connect()
+    if mongo.profiles is None:
+        print("MongoDB is not available; nothing to rescore.")
+        return
+    rescored, skipped = rescore_profiles(mongo.profiles, stale_only=stale_only)
+    print(f"Rescored {rescored} profiles ({skipped} without stored stats skipped).")
+
+@app.route('/api/rating-history/<username>')
+def get_rating_history(username):
+    """Get a user's stored daily rating history"""
+    profiles_collection = get_profiles_collection()
+    if profiles_collection is None:
+        return jsonify({'error': 'Rating history is unavailable right now.'}), 503
+    try:
+        projection = ['rating', 'rating_history']
+        profile = profiles_collection.find_one({'_id': username}, projection=projection)
+        if profile is None:
+            # Logins are case-insensitive on GitHub; _id keeps GitHub's casing
+            profile = profiles_collection.find_one({'login_lower': username.lower()}, projection=projection)
+        if profile is None:
+            return jsonify({'error': f"No stored profile for '{username}'"}), 404
+        history = profile.get('rating_history', {})
+        dates = sorted(history)
+        return jsonify({
+            'dates': dates,
+            'ratings': [history[d] for d in dates],
+            'current_rating': profile.get('rating')
+        })
+    except Exception as e:
+        print(f"Unexpected error in get_rating_history for {username}: {e}")
+        return jsonify({'error': 'An unexpected internal server error occurred.'}), 500
 
 @app.route('/api/profile/<username>')
 def get_profile(username):
     """Get GitHub user profile data and save it to MongoDB"""
     try:
         # Get basic profile data
-        response = requests.get(f'https://api.github.com/users/{username}', headers=HEADERS)
+        response = github_get(f'https://api.github.com/users/{username}', headers=HEADERS)
         response.raise_for_status()
-        profile_data = response.json()
+        profile_data = read_json(response)
 
         # --- Fetch all repositories to calculate total stars ---
-        repos = []
-        page = 1
-        has_more_repos = True
-        while has_more_repos:
-            repos_response = requests.get(
+        total_stars = star_total_cache.get(username.lower())
+        if total_stars is None:
+            repos = fetch_records(
                 f'https://api.github.com/users/{username}/repos',
-                headers=HEADERS,
-                params={'page': page, 'per_page': 100}
+                RepoRecord,
+                raise_for_status=True
             )
-            repos_response.raise_for_status()
-            repos_page = repos_response.json()
-            if not repos_page:
-                has_more_repos = False
-            else:
-                repos.extend(repos_page)
-                page += 1
-        total_stars = sum(repo.get('stargazers_count', 0) for repo in repos)
+            total_stars = sum(repo.stargazers_count for repo in repos)
+            star_total_cache.set(username.lower(), total_stars)
 
         # Get additional stats from GitHub API
         stats = {'total_stars': total_stars}
+        # Steps that failed; their stats are reported as 0 and nothing is stored
+        skipped = []
         
         # Get PRs created by user
         try:
-            pr_response = requests.get(
+            pr_response = github_get(
                 f'https://api.github.com/search/issues?q=author:{username}+type:pr',
                 headers=HEADERS
             )
-            if pr_response.ok:
-                pr_data = pr_response.json()
-                stats['total_prs'] = pr_data.get('total_count', 0)
+            pr_response.raise_for_status()
+            pr_data = read_json(pr_response)
+            stats['total_prs'] = pr_data.get('total_count', 0)
         except Exception as e:
             print(f"Error fetching PR data: {e}")
             stats['total_prs'] = 0
+            skipped.append('pr_search')
         
         # Get issues created by user
         try:
-            issue_response = requests.get(
+            issue_response = github_get(
                 f'https://api.github.com/search/issues?q=author:{username}+type:issue',
                 headers=HEADERS
             )
-            if issue_response.ok:
-                issue_data = issue_response.json()
-                stats['total_issues'] = issue_data.get('total_count', 0)
+            issue_response.raise_for_status()
+            issue_data = read_json(issue_response)
+            stats['total_issues'] = issue_data.get('total_count', 0)
         except Exception as e:
             print(f"Error fetching issue data: {e}")
             stats['total_issues'] = 0
+            skipped.append('issue_search')
         
-        # Get repositories contributed to with better accuracy
+        # Fetch events once for both contribution and commit tracking
         try:
-            # Fetch more events for better contribution tracking
-            all_events = []
-            for page in range(1, 6):  # Get up to 5 pages
-                events_response = requests.get(
-                    f'https://api.github.com/users/{username}/events',
-                    headers=HEADERS,
-                    params={'per_page': 100, 'page': page}
-                )
-                if events_response.ok:
-                    page_events = events_response.json()
-                    if not page_events:
-                        break
-                    all_events.extend(page_events)
-                else:
-                    break
-            
-            # Get unique repos from various events in the last year
-            one_year_ago = datetime.datetime.now() - datetime.timedelta(days=365)
-            contributed_repos = set()
-            
-            for event in all_events:
-                event_date = datetime.datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-                if event_date > one_year_ago:
-                    # Include more event types for better tracking
-                    if event['type'] in ['PushEvent', 'PullRequestEvent', 'IssuesEvent', 'CreateEvent', 'ForkEvent']:
-                        if 'repo' in event:
-                            contributed_repos.add(event['repo']['name'])
-            
-            stats['contributed_to'] = len(contributed_repos)
+            all_events = fetch_records(
+                f'https://api.github.com/users/{username}/events',
+                EventRecord,
+                max_pages=3,  # GitHub serves at most 300 events; later pages are errors
+                raise_for_status=True
+            )
         except Exception as e:
             print(f"Error fetching events data: {e}")
-            stats['contributed_to'] = 0
-        
-        # Get commit count using GraphQL-style approach with events
-        current_year = datetime.datetime.now().year
-        try:
-            commit_count = 0
-            # Fetch more events for better accuracy
             all_events = []
-            for page in range(1, 6):  # Get up to 5 pages (500 events)
-                events_response = requests.get(
-                    f'https://api.github.com/users/{username}/events',
-                    headers=HEADERS,
-                    params={'per_page': 100, 'page': page}
-                )
-                if events_response.ok:
-                    page_events = events_response.json()
-                    if not page_events:
-                        break
-                    all_events.extend(page_events)
-                else:
-                    break
-            
-            # Count commits from current year
-            for event in all_events:
-                if event['type'] == 'PushEvent':
-                    event_date = datetime.datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ')
-                    if event_date.year == current_year:
-                        if 'payload' in event and 'commits' in event['payload']:
-                            commit_count += len(event['payload']['commits'])
-            
-            stats['commits_current_year'] = commit_count
-        except Exception as e:
-            print(f"Error calculating commit count: {e}")
-            stats['commits_current_year'] = 0
+            skipped.append('events')
 
-        # --- Enhanced rating calculation ---
-        def calculate_rating(profile, stars, commits, prs, issues, contributions, repos_count):
-            # Enhanced scoring with higher base values and multipliers
-            star_score = min(20, stars * 0.5 + 10)  # Stars (20%) + base 10
-            commit_score = min(35, commits * 0.8 + 15)  # Commits (35%) + base 15
-            pr_score = min(15, prs * 1.5 + 5)  # PRs (15%) + base 5
-            issue_score = min(10, issues * 1.0 + 3)  # Issues (10%) + base 3
-            contribution_score = min(10, contributions * 3 + 5)  # Contributions (10%) + base 5
-            
-            # Account age bonus (more generous)
-            account_age_days = (datetime.datetime.now() - datetime.datetime.strptime(profile['created_at'], '%Y-%m-%dT%H:%M:%SZ')).days
-            age_bonus = min(10, (account_age_days / 365) * 5 + 5)  # Max 10 points, base 5
-            
-            # Repository quality bonus (more generous)
-            repo_bonus = min(15, repos_count * 1.2 + 8)  # Max 15 points, base 8
-            
-            # Follower bonus
-            follower_bonus = min(5, profile.get('followers', 0) * 0.1)
-            
-            total_score = round(star_score + commit_score + pr_score + issue_score + contribution_score + age_bonus + repo_bonus + follower_bonus)
-            return max(50, min(100, total_score))  # Minimum 50, maximum 100
+        # Get unique repos from various events in the last year
+        one_year_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=365)
+        stats['contributed_to'] = len({
+            event.repo_name for event in all_events
+            if event.created_at > one_year_ago
+            and event.type in CONTRIBUTION_EVENT_TYPES
+            and event.repo_name
+        })
 
+        # Count commits from current year
+        current_year = datetime.datetime.now(datetime.timezone.utc).year
+        stats['commits_current_year'] = sum(
+            event.commit_count for event in all_events
+            if event.created_at.year == current_year
+        )
+
+        # --- Enhanced rating calculation ---
         rating = calculate_rating(
-            profile_data,
-            stats.get('total_stars', 0),
-            stats.get('commits_current_year', 0),
-            stats.get('total_prs', 0),
-            stats.get('total_issues', 0),
-            stats.get('contributed_to', 0),
-            profile_data.get('public_repos', 0)
+            datetime.datetime.strptime(profile_data['created_at'], '%Y-%m-%dT%H:%M:%SZ'),
+            profile_data.get('followers', 0),
+            profile_data.get('public_repos', 0),
+            stats
         )
         stats['rating'] = rating
+        stats['partial'] = bool(skipped)
+        stats['skipped'] = skipped
+        if skipped:
+            mark_partial(*skipped)
         # --- Save/Update profile in MongoDB ---
+        profiles_collection = get_profiles_collection()
         if profiles_collection is not None:
             try:
                 # Prepare the document to be saved
                 user_document = {
                     'github_id': profile_data['id'],
+                    # Indexed, for case-insensitive lookups by login
+                    'login_lower': profile_data['login'].lower(),
                     'name': profile_data.get('name'),
                     'bio': profile_data.get('bio'),
                     'email': profile_data.get('email'),
@@ -209,9 +1128,18 @@ def get_profile(username):
                     'public_repos': profile_data.get('public_repos'),
                     'followers': profile_data.get('followers'),
                     'created_at': datetime.datetime.strptime(profile_data['created_at'], '%Y-%m-%dT%H:%M:%SZ'),
-                    'last_fetched_profile': datetime.datetime.utcnow(),
-                    'rating': rating
+                    'last_fetched_profile': datetime.datetime.utcnow()
                 }
+                # Keep the last complete stats and rating rather than zeros from a failed step
+                if not skipped:
+                    user_document.update({
+                        # Kept so ratings can be recomputed without calling GitHub
+                        'stats': {field: stats.get(field, 0) for field in RATING_STAT_FIELDS},
+                        'rating': rating,
+                        'rating_stale': False,
+                        # One point per day; later fetches the same day overwrite it
+                        f"rating_history.{datetime.datetime.utcnow().strftime('%Y-%m-%d')}": rating
+                    })
                 
                 # Use update_one with upsert=True to insert or update the document
                 # The document _id will be the GitHub username (login)
@@ -247,14 +1175,14 @@ def get_repositories(username):
         has_more_repos = True
         
         while has_more_repos:
-            response = requests.get(
+            response = github_get(
                 f'https://api.github.com/users/{username}/repos',
                 headers=HEADERS,
                 params={'page': page, 'per_page': 100}
             )
             response.raise_for_status()
             
-            repos_page = response.json()
+            repos_page = read_json(response)
             if not repos_page:
                 has_more_repos = False
             else:
@@ -269,16 +1197,26 @@ def get_repositories(username):
         print(f"Unexpected error in get_repositories for {username}: {e}")
         return jsonify({'error': 'An unexpected internal server error occurred.'}), 500
 
+def download_repo_languages(full_name):
+    """Language byte counts for a repository, straight from GitHub"""
+    response = github_get(f'https://api.github.com/repos/{full_name}/languages', headers=HEADERS)
+    response.raise_for_status()
+    return read_json(response)
+
+def fetch_repo_languages(full_name):
+    """Language byte counts for a repository, cached until a push changes them"""
+    cache_key = full_name.lower()
+    languages = repo_language_cache.get(cache_key)
+    if languages is None:
+        languages = download_repo_languages(full_name)
+        repo_language_cache.set(cache_key, languages)
+    return languages
+
 @app.route('/api/languages/<username>/<repo>')
 def get_languages(username, repo):
     """Get languages for a specific repository"""
     try:
-        response = requests.get(
-            f'https://api.github.com/repos/{username}/{repo}/languages',
-            headers=HEADERS
-        )
-        response.raise_for_status()
-        return jsonify(response.json())
+        return jsonify(fetch_repo_languages(f'{username}/{repo}'))
     except requests.exceptions.RequestException as e:
         print(f"Request error fetching languages for {username}/{repo}: {e}")
         return jsonify({'error': 'A network or API error occurred while fetching languages.'}), 500
@@ -291,39 +1229,47 @@ def get_user_languages(username):
     """Get aggregated language statistics for a user"""
     try:
         # Get user's repositories
-        repos_response = requests.get(
+        repos = fetch_records(
             f'https://api.github.com/users/{username}/repos',
-            headers=HEADERS,
-            params={'per_page': 100}
+            RepoRecord,
+            max_pages=1,
+            raise_for_status=True
         )
-        repos_response.raise_for_status()
-        repos = repos_response.json()
         
         # Aggregate languages across all repositories
         languages = {}
+        # Repos whose languages are missing from the totals
+        failed = []
         
-        for repo in repos:
-            # Skip forks to focus on user's own code
-            if repo.get('fork', False):
-                continue
-                
+        # Skip forks to focus on user's own code
+        own_repos = [repo for repo in repos if not repo.fork]
+        # One cache round trip for every repo, then GitHub only for the misses
+        cached = repo_language_cache.get_many([repo.full_name.lower() for repo in own_repos])
+        downloaded = {}
+        for index, repo in enumerate(own_repos):
             try:
-                lang_response = requests.get(
-                    repo['languages_url'],
-                    headers=HEADERS
-                )
+                repo_languages = cached.get(repo.full_name.lower())
+                if repo_languages is None:
+                    repo_languages = download_repo_languages(repo.full_name)
+                    downloaded[repo.full_name.lower()] = repo_languages
                 
-                if lang_response.ok:
-                    repo_languages = lang_response.json()
-                    
-                    for lang, bytes_count in repo_languages.items():
-                        if lang in languages:
-                            languages[lang] += bytes_count
-                        else:
-                            languages[lang] = bytes_count
+                for lang, bytes_count in repo_languages.items():
+                    if lang in languages:
+                        languages[lang] += bytes_count
+                    else:
+                        languages[lang] = bytes_count
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                print(f"Stopping language check for {username}: {e}")
+                failed.extend(r.name for r in own_repos[index:])
+                break
             except Exception as e:
-                print(f"Error fetching languages for {repo['name']}: {e}")
+                print(f"Error fetching languages for {repo.name}: {e}")
+                failed.append(repo.name)
         
+        repo_language_cache.set_many(downloaded)
+        if failed:
+            print(f"Languages for {username} are missing {len(failed)} repos: {', '.join(failed)}")
+            mark_partial('repo_languages')
         return jsonify(languages)
     except requests.exceptions.RequestException as e:
         print(f"Request error fetching user languages for {username}: {e}")
@@ -346,21 +1292,13 @@ def get_commits(username):
         num_days = days_map.get(time_range, 30)
         start_date = end_date - datetime.timedelta(days=num_days)
 
-        # Fetch user events (paginated)
-        events = []
-        for page in range(1, 11): # Fetch up to 10 pages (1000 events)
-            events_response = requests.get(
-                f'https://api.github.com/users/{username}/events',
-                headers=HEADERS,
-                params={'per_page': 100, 'page': page}
-            )
-            if not events_response.ok:
-                break
-            
-            page_events = events_response.json()
-            if not page_events:
-                break
-            events.extend(page_events)
+        # Fetch user events (paginated); a failed page fails the request rather than truncating it
+        events = fetch_records(
+            f'https://api.github.com/users/{username}/events',
+            EventRecord,
+            max_pages=3,  # GitHub serves at most 300 events; later pages are errors
+            raise_for_status=True
+        )
 
         # Initialize commit counts for each day in the range
         commit_counts_by_date = {
@@ -370,12 +1308,10 @@ def get_commits(username):
 
         # Process events
         for event in events:
-            if event['type'] == 'PushEvent':
-                event_date_utc = datetime.datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                if start_date <= event_date_utc <= end_date:
-                    date_str = event_date_utc.strftime('%Y-%m-%d')
-                    if date_str in commit_counts_by_date:
-                        commit_counts_by_date[date_str] += len(event['payload'].get('commits', []))
+            if event.type == 'PushEvent' and start_date <= event.created_at <= end_date:
+                date_str = event.created_at.strftime('%Y-%m-%d')
+                if date_str in commit_counts_by_date:
+                    commit_counts_by_date[date_str] += event.commit_count
 
         # Format for chart
         sorted_dates = sorted(commit_counts_by_date.keys())
@@ -412,127 +1348,87 @@ def get_activity(username):
             'issues': {d: 0 for d in date_keys},
             'commits': {d: 0 for d in date_keys}
         }
+        # Steps dropped because the request budget ran low or GitHub is failing
+        skipped = []
         
         # Method 1: Use Search API for commits (more comprehensive)
         try:
-            start_search = start_date.strftime('%Y-%m-%d')
-            end_search = end_date.strftime('%Y-%m-%d')
-            
-            # Search for commits by author in the date range
-            commits_response = requests.get(
-                f'https://api.github.com/search/commits',
-                headers={**HEADERS, 'Accept': 'application/vnd.github.cloak-preview'},
-                params={
-                    'q': f'author:{username} OR committer:{username} committer-date:{start_search}..{end_search}',
-                    'per_page': 100,
-                    'sort': 'committer-date'
-                },
-                timeout=15
+            # Harvest every matching commit across the range, not just the first page
+            commits, complete = harvest_search(
+                'commits',
+                commit_search_query(username),
+                'committer-date',
+                start_date,
+                end_date,
+                item_key=lambda commit: commit['sha'],
+                # Use committer date for more accuracy
+                item_date=lambda commit: commit['commit']['committer']['date'],
+                headers={**HEADERS, 'Accept': 'application/vnd.github.cloak-preview'}
             )
+            if not complete:
+                skipped.append('commit_search')
             
-            if commits_response.ok:
-                commits_data = commits_response.json()
-                commits = commits_data.get('items', [])
-                
-                print(f"Found {len(commits)} commits via search API")
-                
-                for commit in commits:
-                    try:
-                        # Use committer date for more accuracy
-                        commit_date_str = commit['commit']['committer']['date']
-                        commit_date = datetime.datetime.strptime(commit_date_str, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                        
-                        if start_date <= commit_date <= end_date:
-                            date_key = commit_date.strftime('%Y-%m-%d')
-                            if date_key in activity['commits']:
-                                activity['commits'][date_key] += 1
-                    except Exception as e:
-                        continue
-            else:
-                print(f"Search API failed: {commits_response.status_code}")
+            print(f"Found {len(commits)} commits via search API")
+            
+            for commit_date in commits.values():
+                if start_date <= commit_date <= end_date:
+                    date_key = commit_date.strftime('%Y-%m-%d')
+                    if date_key in activity['commits']:
+                        activity['commits'][date_key] += 1
                 
         except Exception as e:
             print(f"Error with search API: {e}")
+            skipped.append('commit_search')
         
         # Method 2: Fallback to Events API for recent activity (last 90 days)
         if sum(activity['commits'].values()) == 0 and num_days <= 90:
             try:
-                events_response = requests.get(
+                if not g.deadline.has(OPTIONAL_STEP_MIN_SECONDS):
+                    raise DeadlineExceeded("Not enough budget left for events fallback")
+                events = fetch_records(
                     f'https://api.github.com/users/{username}/events',
-                    headers=HEADERS,
-                    params={'per_page': 100}
+                    EventRecord,
+                    max_pages=1,
+                    raise_for_status=True
                 )
+                print(f"Fallback: Processing {len(events)} events")
                 
-                if events_response.ok:
-                    events = events_response.json()
-                    print(f"Fallback: Processing {len(events)} events")
-                    
-                    for event in events:
-                        if event['type'] == 'PushEvent':
-                            try:
-                                event_date = datetime.datetime.strptime(event['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                                
-                                if start_date <= event_date <= end_date:
-                                    date_key = event_date.strftime('%Y-%m-%d')
-                                    if date_key in activity['commits']:
-                                        commits_in_push = len(event.get('payload', {}).get('commits', []))
-                                        activity['commits'][date_key] += commits_in_push
-                            except Exception:
-                                continue
+                for event in events:
+                    if event.type == 'PushEvent' and start_date <= event.created_at <= end_date:
+                        date_key = event.created_at.strftime('%Y-%m-%d')
+                        if date_key in activity['commits']:
+                            activity['commits'][date_key] += event.commit_count
                                 
+            except (DeadlineExceeded, CircuitOpenError) as e:
+                print(f"Skipping events fallback: {e}")
+                skipped.append('events_fallback')
             except Exception as e:
                 print(f"Events API fallback failed: {e}")
+                skipped.append('events_fallback')
         
         # Get PRs and Issues using search API for the time range
-        try:
-            # Format dates for search API
-            start_search = start_date.strftime('%Y-%m-%d')
-            end_search = end_date.strftime('%Y-%m-%d')
-            
-            # Get PRs
-            pr_response = requests.get(
-                f'https://api.github.com/search/issues',
-                headers=HEADERS,
-                params={
-                    'q': f'author:{username} type:pr created:{start_search}..{end_search}',
-                    'per_page': 100
-                }
-            )
-            
-            if pr_response.ok:
-                prs = pr_response.json().get('items', [])
-                for pr in prs:
-                    try:
-                        created_date = datetime.datetime.strptime(pr['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                        date_key = created_date.strftime('%Y-%m-%d')
-                        if date_key in activity['pullRequests']:
-                            activity['pullRequests'][date_key] += 1
-                    except Exception:
-                        continue
-            
-            # Get Issues
-            issue_response = requests.get(
-                f'https://api.github.com/search/issues',
-                headers=HEADERS,
-                params={
-                    'q': f'author:{username} type:issue created:{start_search}..{end_search}',
-                    'per_page': 100
-                }
-            )
-            
-            if issue_response.ok:
-                issues = issue_response.json().get('items', [])
-                for issue in issues:
-                    try:
-                        created_date = datetime.datetime.strptime(issue['created_at'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                        date_key = created_date.strftime('%Y-%m-%d')
-                        if date_key in activity['issues']:
-                            activity['issues'][date_key] += 1
-                    except Exception:
-                        continue
+        for activity_key, search_type in (('pullRequests', 'pr'), ('issues', 'issue')):
+            try:
+                items, complete = harvest_search(
+                    'issues',
+                    issue_search_query(username, search_type),
+                    'created',
+                    start_date,
+                    end_date,
+                    item_key=lambda item: item['id'],
+                    item_date=lambda item: item['created_at']
+                )
+                if not complete:
+                    skipped.append(f'{search_type}_search')
+                
+                for created_date in items.values():
+                    date_key = created_date.strftime('%Y-%m-%d')
+                    if date_key in activity[activity_key]:
+                        activity[activity_key][date_key] += 1
                         
-        except Exception as e:
-            print(f"Error fetching PRs/Issues: {e}")
+            except Exception as e:
+                print(f"Error fetching {search_type} search results: {e}")
+                skipped.append(f'{search_type}_search')
         
         # Calculate totals
         total_commits = sum(activity['commits'][d] for d in date_keys)
@@ -541,63 +1437,80 @@ def get_activity(username):
         
         print(f"Real activity for {username}: {total_commits} commits, {total_prs} PRs, {total_issues} issues")
         
-        # Enhanced repository-based commit fetching (primary method)
+        # Enhanced repository-based commit fetching (optional enrichment)
         try:
-            repos_response = requests.get(
+            if not g.deadline.has(OPTIONAL_STEP_MIN_SECONDS):
+                raise DeadlineExceeded("Not enough budget left for repository commit check")
+            repos = fetch_records(
                 f'https://api.github.com/users/{username}/repos',
-                headers=HEADERS,
-                params={'per_page': 100, 'sort': 'updated'}
+                RepoRecord,
+                max_pages=1,
+                params={'sort': 'updated'}
             )
+            print(f"Checking {len(repos)} repositories for commits")
             
-            if repos_response.ok:
-                repos = repos_response.json()
-                print(f"Checking {len(repos)} repositories for commits")
-                
-                for repo in repos[:20]:  # Check top 20 repos
-                    try:
-                        # Skip forks unless they have recent activity
-                        if repo.get('fork', False):
-                            continue
-                            
-                        since_param = start_date.strftime('%Y-%m-%dT%H:%M:%SZ')
-                        until_param = end_date.strftime('%Y-%m-%dT%H:%M:%SZ')
-                        
-                        repo_commits_response = requests.get(
-                            f"https://api.github.com/repos/{repo['full_name']}/commits",
-                            headers=HEADERS,
-                            params={
-                                'author': username,
-                                'since': since_param,
-                                'until': until_param,
-                                'per_page': 100
-                            },
-                            timeout=10
-                        )
-                        
-                        if repo_commits_response.ok:
-                            repo_commits = repo_commits_response.json()
-                            
-                            for commit in repo_commits:
-                                try:
-                                    commit_date_str = commit['commit']['author']['date']
-                                    commit_date = datetime.datetime.strptime(commit_date_str, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=datetime.timezone.utc)
-                                    
-                                    if start_date <= commit_date <= end_date:
-                                        date_key = commit_date.strftime('%Y-%m-%d')
-                                        if date_key in activity['commits']:
-                                            activity['commits'][date_key] += 1
-                                except Exception:
-                                    continue
-                                    
-                    except Exception as e:
+            since_param = start_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+            until_param = end_date.strftime('%Y-%m-%dT%H:%M:%SZ')
+            
+            for repo in repos[:20]:  # Check top 20 repos
+                # Stop early rather than blow the request budget
+                if not g.deadline.has(OPTIONAL_STEP_MIN_SECONDS):
+                    skipped.append('repo_commits')
+                    break
+                try:
+                    # Skip forks unless they have recent activity
+                    if repo.fork:
                         continue
-                        
-                # Recalculate total after repo check
-                total_commits = sum(activity['commits'][d] for d in date_keys)
-                print(f"After enhanced repo check: {total_commits} commits found")
-                
+                    
+                    repo_commits_response = github_get(
+                        f"https://api.github.com/repos/{repo.full_name}/commits",
+                        headers=HEADERS,
+                        params={
+                            'author': username,
+                            'since': since_param,
+                            'until': until_param,
+                            'per_page': 100
+                        },
+                        timeout=10
+                    )
+                    
+                    if repo_commits_response.ok:
+                        for commit in read_json(repo_commits_response):
+                            try:
+                                commit_date = parse_github_date(commit['commit']['author']['date'])
+                                
+                                if start_date <= commit_date <= end_date:
+                                    date_key = commit_date.strftime('%Y-%m-%d')
+                                    if date_key in activity['commits']:
+                                        activity['commits'][date_key] += 1
+                            except Exception:
+                                continue
+                    elif repo_commits_response.status_code != 409:  # 409 means the repo is empty
+                        skipped.append('repo_commits')
+                                
+                except (DeadlineExceeded, CircuitOpenError) as e:
+                    print(f"Stopping repository commit check: {e}")
+                    skipped.append('repo_commits')
+                    break
+                except Exception as e:
+                    print(f"Repository commit check failed for {repo.full_name}: {e}")
+                    skipped.append('repo_commits')
+                    continue
+                    
+            # Recalculate total after repo check
+            total_commits = sum(activity['commits'][d] for d in date_keys)
+            print(f"After enhanced repo check: {total_commits} commits found")
+            
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            print(f"Skipping enhanced repository check: {e}")
+            skipped.append('repo_commits')
         except Exception as e:
             print(f"Enhanced repository check failed: {e}")
+            skipped.append('repo_commits')
+        
+        skipped = list(dict.fromkeys(skipped))  # Report each step once
+        if skipped:
+            mark_partial(*skipped)
         
         return jsonify({
             'dates': date_keys,
@@ -610,7 +1523,9 @@ def get_activity(username):
                 'total_commits': total_commits,
                 'total_prs': total_prs,
                 'total_issues': total_issues,
-                'method': 'comprehensive_search'
+                'method': 'comprehensive_search',
+                'partial': bool(skipped),
+                'skipped': skipped
             }
         })
         
@@ -621,6 +1536,165 @@ def get_activity(username):
         print(f"Unexpected error in get_activity for {username}: {e}")
         return jsonify({'error': 'An unexpected internal server error occurred.'}), 500
     
+#################################################################
+# GitHub webhooks
+#################################################################
+
+# Shared secret configured on the webhooks of opted-in users' repos or orgs
+GITHUB_WEBHOOK_SECRET = os.getenv('GITHUB_WEBHOOK_SECRET')
+
+def verify_webhook_signature(body, signature):
+    """Check GitHub's X-Hub-Signature-256 HMAC of the raw request body"""
+    if not GITHUB_WEBHOOK_SECRET or not signature or not signature.startswith('sha256='):
+        return False
+    expected = 'sha256=' + hmac.new(GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    # compare_digest only takes ASCII strs; bytes also cover forged non-ASCII headers
+    return hmac.compare_digest(expected.encode(), signature.encode('utf-8', 'surrogateescape'))
+
+def _owner_login(repository):
+    owner = repository.get('owner') or {}
+    # Push payloads describe the owner with 'name' as well as 'login'
+    return owner.get('login') or owner.get('name')
+
+def _invalidate_search_day(endpoint, query, timestamp):
+    day = parse_github_date(timestamp).date()
+    if search_day_cache.pop((endpoint, query.lower(), day)):
+        return f"{endpoint}:{query}:{day.isoformat()}"
+    return None
+
+def _invalidate_push(payload):
+    """A push changes the repo's languages, its authors' commit days and the pusher's commit count"""
+    repository = payload.get('repository', {})
+    invalidated = []
+    stat_changes = {}
+    pusher = (payload.get('sender') or {}).get('login')
+    current_year = datetime.datetime.now(datetime.timezone.utc).year
+    this_year = [c for c in payload.get('commits', []) if c.get('timestamp') and parse_github_date(c['timestamp']).year == current_year]
+    if pusher and this_year:
+        # get_profile counts the commits in the user's own push events
+        stat_changes[pusher] = {'commits_current_year': len(this_year)}
+    if repository.get('full_name') and repo_language_cache.pop(repository['full_name'].lower()):
+        invalidated.append(f"languages:{repository['full_name']}")
+    for commit in payload.get('commits', []):
+        for role in ('author', 'committer'):
+            login = (commit.get(role) or {}).get('username')
+            if not login or not commit.get('timestamp'):
+                continue
+            invalidated.append(_invalidate_search_day('commits', commit_search_query(login), commit['timestamp']))
+    return invalidated, stat_changes
+
+def _invalidate_repository(payload):
+    """Created, deleted, renamed or transferred repos change star totals and languages"""
+    repository = payload.get('repository', {})
+    changes = payload.get('changes', {})
+    owners = {_owner_login(repository)}
+    full_names = {repository.get('full_name')}
+    previous_name = changes.get('repository', {}).get('name', {}).get('from')
+    if previous_name:
+        full_names.add(f"{_owner_login(repository)}/{previous_name}")
+    previous_owner = changes.get('owner', {}).get('from', {}).get('user', {}).get('login')
+    if previous_owner:
+        owners.add(previous_owner)
+        full_names.add(f"{previous_owner}/{repository.get('name')}")
+    owners.discard(None)
+
+    invalidated = []
+    for owner in owners:
+        if star_total_cache.pop(owner.lower()):
+            invalidated.append(f"stars:{owner}")
+    for full_name in filter(None, full_names):
+        if repo_language_cache.pop(full_name.lower()):
+            invalidated.append(f"languages:{full_name}")
+    # Star totals aren't stored with profiles; the next fetch recomputes them
+    return invalidated, {}
+
+def _invalidate_issue_like(search_type, stat_field, payload, item):
+    """A PR/issue changes its author's daily counts; opening or deleting one changes their total"""
+    login = (item.get('user') or {}).get('login')
+    if not login or not item.get('created_at'):
+        return [], {}
+    invalidated = [_invalidate_search_day('issues', issue_search_query(login, search_type), item['created_at'])]
+    delta = {'opened': 1, 'deleted': -1}.get(payload.get('action'))
+    return invalidated, ({login: {stat_field: delta}} if delta else {})
+
+def _affected_logins(payload):
+    """Every user whose API responses an event may change"""
+    logins = {(payload.get('sender') or {}).get('login')}
+    repository = payload.get('repository') or {}
+    logins.add(_owner_login(repository))
+    logins.add(payload.get('changes', {}).get('owner', {}).get('from', {}).get('user', {}).get('login'))
+    for commit in payload.get('commits', []):
+        logins.update((commit.get(role) or {}).get('username') for role in ('author', 'committer'))
+    for item_key in ('pull_request', 'issue'):
+        logins.add(((payload.get(item_key) or {}).get('user') or {}).get('login'))
+    logins.discard(None)
+    return logins
+
+WEBHOOK_HANDLERS = {
+    'push': _invalidate_push,
+    'repository': _invalidate_repository,
+    'pull_request': lambda payload: _invalidate_issue_like('pr', 'total_prs', payload, payload.get('pull_request', {})),
+    'issues': lambda payload: _invalidate_issue_like('issue', 'total_issues', payload, payload.get('issue', {}))
+}
+
+def patch_stored_stats(stat_changes):
+    """Apply {login: {stat: delta}} to stored profiles and flag their ratings stale.
+
+    `flask --app app rescore-ratings --stale-only` then rescores just those
+    profiles from the patched stats.
+    """
+    profiles_collection = get_profiles_collection()
+    if profiles_collection is None:
+        return 0
+    patched = 0
+    for login, deltas in stat_changes.items():
+        try:
+            result = profiles_collection.update_one(
+                # Profiles saved without stats can't be rescored, so leave them alone
+                {'_id': login, 'stats': {'$exists': True}},
+                {'$set': {'rating_stale': True}, '$inc': {f'stats.{field}': delta for field, delta in deltas.items()}}
+            )
+            patched += result.modified_count
+        except Exception as e:
+            print(f"Failed to patch stored stats for '{login}': {e}")
+    return patched
+
+@app.route('/api/webhooks/github', methods=['POST'])
+def github_webhook():
+    """Invalidate cached data affected by a GitHub push, repository, pull_request or issues event"""
+    if not GITHUB_WEBHOOK_SECRET:
+        return jsonify({'error': 'Webhooks are not configured'}), 503
+
+    body = request.get_data()
+    if not verify_webhook_signature(body, request.headers.get('X-Hub-Signature-256')):
+        return jsonify({'error': 'Invalid webhook signature'}), 401
+
+    event = request.headers.get('X-GitHub-Event', '')
+    if event == 'ping':
+        return jsonify({'event': event, 'status': 'pong'})
+    handler = WEBHOOK_HANDLERS.get(event)
+    if handler is None:
+        return jsonify({'event': event, 'status': 'ignored'}), 202
+
+    try:
+        payload = json_loads(body)
+        invalidated, stat_changes = handler(payload)
+        # Otherwise a reload within max-age would still get 304 for the old body
+        forgotten = forget_issued_etags(_affected_logins(payload))
+    except (ValueError, TypeError, AttributeError) as e:
+        print(f"Malformed {event} webhook payload: {e}")
+        return jsonify({'error': 'Malformed webhook payload'}), 400
+
+    invalidated = [entry for entry in invalidated if entry]
+    stale = patch_stored_stats(stat_changes)
+    print(f"Webhook {event}: invalidated {len(invalidated)} cache entries and {forgotten} ETags, {stale} ratings marked stale")
+    return jsonify({
+        'event': event,
+        'status': 'processed',
+        'invalidated': invalidated,
+        'ratings_marked_stale': stale
+    })
+    
 #################################################################
 # Groq AI Integration and additional routes
 #################################################################
@@ -645,23 +1719,100 @@ else:
 
 # Helper function to get GitHub headers
 def get_github_headers():
-    """Get headers for GitHub API requests"""
-    headers = {
-        'Accept': 'application/vnd.github.v3+json',
-        'User-Agent': 'GitHub-Profile-Analyzer'
-    }
-    if GITHUB_TOKEN:
-        headers['Authorization'] = f'token {GITHUB_TOKEN}'
-    return headers
+    """Get headers for GitHub API requests; github_get adds the pool token"""
+    return dict(HEADERS)
+
+#################################################################
+# Frontend assets
+#################################################################
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_ASSET_DIRS = ('css', 'js', 'assets')
+# Fingerprinted URLs never change content, so clients may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+COMPRESSIBLE_MIMETYPES = ('text/', 'application/javascript', 'image/x-icon', 'image/vnd.microsoft.icon', 'image/svg+xml')
+
+class StaticAsset:
+    """A frontend file held in memory with its precompressed variants"""
+    __slots__ = ('mimetype', 'etag', 'bodies')
+
+    def __init__(self, data, mimetype):
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(data).hexdigest()[:16]
+        self.bodies = {'identity': data}
+        if mimetype.startswith(COMPRESSIBLE_MIMETYPES):
+            self.bodies['gzip'] = gzip.compress(data, compresslevel=9)
+            if brotli:
+                self.bodies['br'] = brotli.compress(data, quality=11)
+
+def build_static_assets():
+    """Fingerprint and precompress the frontend, rewriting index.html to match.
+
+    Returns (assets, index) where assets maps 'dir/name.<hash>.ext' to its
+    StaticAsset and index is the rewritten index.html.
+    """
+    assets = {}
+    fingerprinted = {}
+    for folder in FRONTEND_ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(BASE_DIR, folder)):
+            for name in files:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                asset = StaticAsset(data, mimetype)
+                stem, ext = os.path.splitext(relative)
+                fingerprinted[relative] = f"{stem}.{asset.etag[:10]}{ext}"
+                assets[fingerprinted[relative]] = asset
+
+    def rewrite(match):
+        # index.html uses Windows-style separators for some references
+        reference = match.group(2).replace('\\', '/')
+        if reference.startswith('./'):
+            reference = reference[2:]
+        if reference not in fingerprinted:
+            return match.group(0)
+        return f'{match.group(1)}="/static/{quote(fingerprinted[reference])}"'
+
+    with open(os.path.join(BASE_DIR, 'index.html'), encoding='utf-8') as f:
+        html = re.sub(r'\b(src|href)="([^"]+)"', rewrite, f.read())
+    index_asset = StaticAsset(html.encode('utf-8'), 'text/html')
+    print(f"Built {len(assets)} fingerprinted frontend assets")
+    return assets, index_asset
+
+STATIC_ASSETS, INDEX_ASSET = build_static_assets()
+
+def asset_response(asset, cache_control):
+    """Serve the best precompressed variant the client accepts"""
+    encodings = [e for e in ('br', 'gzip') if e in asset.bodies]
+    encoding = request.accept_encodings.best_match(encodings) if encodings else None
+    response = app.response_class(asset.bodies[encoding or 'identity'], mimetype=asset.mimetype)
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = cache_control
+    # Weak, since the plain and precompressed bodies share one tag
+    response.set_etag(asset.etag, weak=True)
+    return response.make_conditional(request)
 
 # Serve frontend
 @app.route('/')
 def index():
-    return send_from_directory('.', 'index.html')
+    # Revalidate every time so a deploy's new asset hashes are picked up
+    return asset_response(INDEX_ASSET, 'no-cache')
+
+@app.route('/static/<path:filename>')
+def fingerprinted_asset(filename):
+    asset = STATIC_ASSETS.get(filename)
+    if asset is None:
+        abort(404)
+    return asset_response(asset, IMMUTABLE_CACHE_CONTROL)
 
-@app.route('/<path:filename>')
-def static_files(filename):
-    return send_from_directory('.', filename)
+@app.route('/<any(css, js, assets):folder>/<path:filename>')
+def static_files(folder, filename):
+    """Unfingerprinted paths, kept for pages cached before fingerprinting"""
+    return send_from_directory(os.path.join(BASE_DIR, folder), filename, max_age=300)
 
 # API status route
 @app.route('/api/status')
@@ -670,8 +1821,38 @@ def status():
         'message': 'GitHub Profile Analyzer API',
         'status': 'running',
         'groq_configured': groq_configured,
-        'github_token_configured': GITHUB_TOKEN is not None,
-        'mongodb_configured': db is not None
+        'github_token_configured': len(github_tokens) > 0,
+        'github_tokens': github_tokens.report(),
+        'mongodb_configured': mongo.state == 'ready',
+        'mongodb_state': mongo.state,
+        'circuits': {
+            'github': github_breaker.state,
+            'groq': groq_breaker.state
+        }
+    })
+
+@app.route('/api/status/live')
+def liveness():
+    """Liveness probe: the worker is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/status/ready')
+def readiness():
+    """Readiness probe: the worker can take traffic.
+
+    Frontend assets are built at import, so a worker that answers is ready.
+    MongoDB and the upstream circuits are reported for information only:
+    every worker shares them, so taking this one out of rotation would not
+    help, and cached and stored data can still be served.
+    """
+    mongo.start()
+    return jsonify({
+        'status': 'ready',
+        'mongodb_state': mongo.state,
+        'circuits': {
+            'github': github_breaker.state,
+            'groq': groq_breaker.state
+        }
     })
 
 @app.route('/api/test-groq')
@@ -695,10 +1876,10 @@ def test_groq():
             "Content-Type": "application/json"
         }
         
-        response = requests.post(GROQ_API_URL, json=payload, headers=headers, timeout=10)
+        response = groq_post(json=payload, headers=headers, timeout=10)
         
         if response.ok:
-            result = response.json()
+            result = read_json(response)
             return jsonify({
                 'status': 'success',
                 'message': 'Groq API is working',
@@ -733,7 +1914,7 @@ def generate_insights(username):
         
         # 1. Fetch GitHub profile data
         profile_url = f'https://api.github.com/users/{username}'
-        profile_resp = requests.get(profile_url, headers=headers)
+        profile_resp = github_get(profile_url, headers=headers)
         
         if not profile_resp.ok:
             if profile_resp.status_code == 404:
@@ -743,26 +1924,26 @@ def generate_insights(username):
             else:
                 return jsonify({'error': f'Failed to fetch GitHub profile: {profile_resp.status_code}'}), 500
         
-        profile_data = profile_resp.json()
+        profile_data = read_json(profile_resp)
         
         # 2. Fetch repositories data
         repos_url = f'https://api.github.com/users/{username}/repos?sort=updated&per_page=30'
-        repos_resp = requests.get(repos_url, headers=headers)
+        repos_resp = github_get(repos_url, headers=headers)
         
         if not repos_resp.ok:
             return jsonify({'error': f'Failed to fetch repositories: {repos_resp.status_code}'}), 500
         
-        repos_data = repos_resp.json()
+        repos_data = [RepoRecord(repo) for repo in read_json(repos_resp)]
 
         # 3. Calculate additional stats
-        total_stars = sum(repo.get('stargazers_count', 0) for repo in repos_data)
-        total_forks = sum(repo.get('forks_count', 0) for repo in repos_data)
-        total_size = sum(repo.get('size', 0) for repo in repos_data)
+        total_stars = sum(repo.stargazers_count for repo in repos_data)
+        total_forks = sum(repo.forks_count for repo in repos_data)
+        total_size = sum(repo.size for repo in repos_data)
         
         # Count languages
         languages = {}
         for repo in repos_data:
-            lang = repo.get('language')
+            lang = repo.language
             if lang:
                 languages[lang] = languages.get(lang, 0) + 1
 
@@ -820,10 +2001,10 @@ Keep response under 400 words. Be specific and actionable."""
                 "Content-Type": "application/json"
             }
             
-            groq_response = requests.post(GROQ_API_URL, json=payload, headers=headers, timeout=30)
+            groq_response = groq_post(json=payload, headers=headers, timeout=30)
             groq_response.raise_for_status()
             
-            result = groq_response.json()
+            result = read_json(groq_response)
             insight_text = result["choices"][0]["message"]["content"]
             
             # Basic validation
@@ -833,6 +2014,7 @@ Keep response under 400 words. Be specific and actionable."""
             print(f"Successfully generated insights for {username}")
             
             # --- Save insight to MongoDB ---
+            profiles_collection = get_profiles_collection()
             if profiles_collection is not None:
                 try:
                     profiles_collection.update_one(
@@ -866,7 +2048,7 @@ Keep response under 400 words. Be specific and actionable."""
             print(f"Groq API request error: {req_error}")
             if hasattr(req_error, 'response') and req_error.response is not None:
                 try:
-                    error_detail = req_error.response.json()
+                    error_detail = read_json(req_error.response)
                     print(f"Error details: {error_detail}")
                     return jsonify({'error': f'Groq API error: {error_detail.get("error", {}).get("message", str(req_error))}'}), 500
                 except:
@@ -887,11 +2069,11 @@ Keep response under 400 words. Be specific and actionable."""
 
 
 if __name__ == '__main__':
-    if not GITHUB_TOKEN:
+    if not len(github_tokens):
         print("Warning: GITHUB_TOKEN not found in environment variables. API requests may be rate limited.")
     else:
         print("Starting GitHub Profile Analyzer backend...")
-        print(f"Using GitHub token: {GITHUB_TOKEN[:5]}...{GITHUB_TOKEN[-5:]}")
+        print(f"Using {len(github_tokens)} GitHub token(s): {', '.join(t.label for t in github_tokens.tokens)}")
     
     port = int(os.environ.get('PORT', 5000))
     print(f"Server running on port {port}")
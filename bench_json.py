@@ -0,0 +1,82 @@
+"""Compare JSON CPU cost per large-account request: stdlib json vs orjson.
+
+Builds payloads shaped like GitHub's (10 pages of events with commit
+payloads, 3 pages of full repo objects), then times what one request does
+with them: decoding every upstream page and encoding the repo list back out.
+
+    python bench_json.py
+"""
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ROUNDS = 20
+
+def make_event(i):
+    return {
+        'id': str(30000000000 + i),
+        'type': 'PushEvent',
+        'actor': {'id': 1, 'login': 'octocat', 'display_login': 'octocat', 'gravatar_id': '',
+                  'url': 'https://api.github.com/users/octocat', 'avatar_url': 'https://avatars.githubusercontent.com/u/1?'},
+        'repo': {'id': i % 50, 'name': f'octocat/repo-{i % 50}', 'url': f'https://api.github.com/repos/octocat/repo-{i % 50}'},
+        'payload': {
+            'repository_id': i % 50, 'push_id': i, 'size': 20, 'distinct_size': 20, 'ref': 'refs/heads/main',
+            'head': 'a' * 40, 'before': 'b' * 40,
+            'commits': [{
+                'sha': f'{i:020d}{c:020d}',
+                'author': {'email': 'octocat@github.com', 'name': 'The Octocat'},
+                'message': 'Fix the thing that was broken in the other thing\n\nLonger description of the change.',
+                'distinct': True,
+                'url': f'https://api.github.com/repos/octocat/repo-{i % 50}/commits/{i:020d}{c:020d}'
+            } for c in range(20)]
+        },
+        'public': True,
+        'created_at': '2026-10-01T12:00:00Z'
+    }
+
+def make_repo(i):
+    repo = {'id': i, 'node_id': f'R_{i:012d}', 'name': f'repo-{i}', 'full_name': f'octocat/repo-{i}', 'private': False,
+            'owner': make_event(0)['actor'], 'description': 'A repository used for benchmarking JSON handling.',
+            'fork': i % 5 == 0, 'created_at': '2015-01-01T00:00:00Z', 'updated_at': '2026-10-01T00:00:00Z',
+            'pushed_at': '2026-10-01T00:00:00Z', 'size': 1234, 'stargazers_count': i, 'watchers_count': i,
+            'language': 'Python', 'forks_count': 3, 'open_issues_count': 2, 'topics': ['api', 'github', 'python'],
+            'default_branch': 'main', 'visibility': 'public'}
+    # The remaining ~40 URL templates every repo object carries
+    for field in ('archive', 'assignees', 'blobs', 'branches', 'collaborators', 'comments', 'commits', 'compare',
+                  'contents', 'contributors', 'deployments', 'downloads', 'events', 'forks', 'git_commits', 'git_refs',
+                  'git_tags', 'hooks', 'issue_comment', 'issue_events', 'issues', 'keys', 'labels', 'languages',
+                  'merges', 'milestones', 'notifications', 'pulls', 'releases', 'stargazers', 'statuses',
+                  'subscribers', 'subscription', 'tags', 'teams', 'trees'):
+        repo[f'{field}_url'] = f'https://api.github.com/repos/octocat/repo-{i}/{field}'
+    return repo
+
+def per_request_cpu(loads, dumps, pages, repos):
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        for page in pages:
+            loads(page)
+        dumps(repos)
+    return (time.process_time() - start) / ROUNDS * 1000
+
+def main():
+    event_pages = [json.dumps([make_event(p * 100 + i) for i in range(100)]).encode() for p in range(10)]
+    repos = [make_repo(i) for i in range(300)]
+    repo_pages = [json.dumps(repos[p * 100:(p + 1) * 100]).encode() for p in range(3)]
+    pages = event_pages + repo_pages
+    print(f"Per request: {len(pages)} pages, {sum(map(len, pages)) / 1e6:.1f} MB decoded, {len(repos)} repos encoded")
+
+    stdlib_ms = per_request_cpu(json.loads, lambda obj: json.dumps(obj).encode(), pages, repos)
+    print(f"stdlib json: {stdlib_ms:.1f} ms CPU")
+    if orjson is None:
+        print("orjson is not installed; pip install orjson to compare")
+        return
+    orjson_ms = per_request_cpu(orjson.loads, orjson.dumps, pages, repos)
+    print(f"orjson:      {orjson_ms:.1f} ms CPU")
+    print(f"Saved:       {stdlib_ms - orjson_ms:.1f} ms CPU per request ({stdlib_ms / orjson_ms:.1f}x faster)")
+
+if __name__ == '__main__':
+    main()